@@ -1,33 +1,196 @@
+import asyncio
 import requests
 import pandas as pd
 import re
-from requests.exceptions import HTTPError
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from collections.abc import Mapping
+from json import loads as json_loads
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from threading import Lock
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from IPython.display import display 
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # h2 is only pulled in by the httpx[http2] extra, without which httpx cannot negotiate HTTP/2
+    import h2
+    import httpx
+except ImportError:
+    httpx = None
+
+MAX_WORKERS = 8
+
+# The resourceId catalog is cached as a DataFrame for CATALOG_TTL seconds, bypassing the response cache of get_json;
+# all other responses, sync or async, are cached as raw bytes in CONTENT_CACHE for JSON_TTL seconds
+CATALOG_URL = 'https://www.tablebuilder.singstat.gov.sg/publicfacing/rest/timeseries/resourceId?keyword=%&searchOption=all'
+CATALOG_TTL = 3600
+CATALOG_CACHE = dict()
+JSON_TTL = 86400
+CONTENT_CACHE = OrderedDict()
+CONTENT_CACHE_SIZE = 256
+CONTENT_CACHE_LOCK = Lock()
+
+# Retry policy shared by the requests session and aget_json
+RETRIES = 5
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = [429, 502, 503, 504]
+
+# A single session keeps the connections to Singstat alive across calls instead of re-doing the TCP and TLS handshakes
+SESSION = requests.Session()
+# Transient failures are retried with exponential backoff here, honouring Retry-After on 429, before any error reaches the caller;
+# raise_on_status=False hands the last failed response back so that raise_for_status raises an HTTPError rather than a RetryError
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=RETRIES, backoff_factor=BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES, raise_on_status=False)))
+
+def decode_json(content):
+    return orjson.loads(content) if orjson else json_loads(content)
+
+def get_content(url, params=None):
+    response = SESSION.get(url, params=params, timeout=(5, 30))
+    response.raise_for_status()
+    return response.content
+
+def content_cache_key(url, params=None):
+    # Keys responses by url, sorted params and JSON_TTL window so that entries expire with the window
+    return (url, tuple(sorted(params.items())) if params else None, int(time.time() // JSON_TTL))
+
+def read_cached_content(key):
+    with CONTENT_CACHE_LOCK:
+        content = CONTENT_CACHE.get(key)
+        if content is not None:
+            CONTENT_CACHE.move_to_end(key)
+        return content
+
+def write_cached_content(key, content):
+    # Evicting the least recently used responses beyond CONTENT_CACHE_SIZE
+    with CONTENT_CACHE_LOCK:
+        CONTENT_CACHE[key] = content
+        CONTENT_CACHE.move_to_end(key)
+        while len(CONTENT_CACHE) > CONTENT_CACHE_SIZE:
+            CONTENT_CACHE.popitem(last=False)
+
 def get_json(url, params=None):
-    if params != None:
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            response_json = response.json()
-            return response_json
-            # If the response was successful, no Exception will be raised
-        except HTTPError as http_err:
-            print(f'HTTP error occurred: {http_err}')
-        except Exception as err:
-            print(f'Other error occurred: {err}')
-    else:
+    # Caching the raw bytes and decoding them on every call so that callers never share, and cannot mutate, the same objects;
+    # failed requests raise before reaching the cache
+    key = content_cache_key(url, params)
+    content = read_cached_content(key)
+    if content is None:
+        content = get_content(url, params=params)
+        write_cached_content(key, content)
+    response_json = decode_json(content)
+    return response_json
+
+def fetch_json(urls, params=None):
+    # Fans out the blocking get_json calls over a thread pool sharing SESSION, returning the responses in the order of urls
+    if len(urls) <= 1:
+        return [get_json(url, params) for url in urls]
+    
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls))) as executor:
+        futures = [executor.submit(get_json, url, params) for url in urls]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        
+        # Cancelling the queued requests as soon as one fails instead of waiting for all of them
+        for future in pending:
+            future.cancel()
+        for future in done:
+            if future.exception():
+                raise future.exception()
+        return [future.result() for future in futures]
+
+def retry_delay(retry_after, attempt):
+    # Honouring a Retry-After header given in seconds or as an HTTP date, otherwise backing off exponentially
+    if retry_after:
+        if retry_after.isdigit():
+            return float(retry_after)
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            response_json = response.json()
-            return response_json
-            # If the response was successful, no Exception will be raised
-        except HTTPError as http_err:
-            print(f'HTTP error occurred: {http_err}')
-        except Exception as err:
-            print(f'Other error occurred: {err}')   
-            
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    return BACKOFF_FACTOR * 2 ** attempt
+
+async def aget_json(client, url, params=None):
+    # Sharing the response cache of get_json, so the sync and async APIs reuse each other's downloads
+    key = content_cache_key(url, params)
+    content = read_cached_content(key)
+    if content is None:
+        # Retrying the same statuses as the requests session, since the httpx transport only retries failed connections
+        for attempt in range(RETRIES + 1):
+            response = await client.get(url, params=params)
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                break
+            await asyncio.sleep(retry_delay(response.headers.get('Retry-After'), attempt))
+        
+        # Raising the same exception type as get_json
+        if response.is_error:
+            raise requests.exceptions.HTTPError(f'{response.status_code} Error: {response.reason_phrase} for url: {response.url}')
+        content = response.content
+        write_cached_content(key, content)
+    response_json = decode_json(content)
+    return response_json
+
+async def afetch_json(urls, params=None):
+    # Awaitable counterpart of fetch_json for callers already running inside an event loop
+    if httpx:
+        # Multiplexing all requests over a single HTTP/2 connection to Singstat
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=httpx.Limits(max_connections=4), retries=5)
+        async with httpx.AsyncClient(transport=transport, timeout=30) as client:
+            return await asyncio.gather(*[aget_json(client, url, params) for url in urls])
+    
+    if not urls:
+        return []
+    
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls)))
+    futures = [loop.run_in_executor(executor, get_json, url, params) for url in urls]
+    try:
+        return await asyncio.gather(*futures)
+    except BaseException:
+        # Cancelling the queued requests as soon as one fails instead of waiting for all of them
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        # Not waiting for requests still in flight, which would block the running event loop
+        executor.shutdown(wait=False)
+
+def is_int(value):
+    # bool is a subclass of int but is not a valid resourceID, limit, offset or year
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def is_str(value):
+    return isinstance(value, str)
+
+def check_list_elements(values, is_valid, message):
+    # Element-wise validation of list arguments, which is skipped under python -O
+    if __debug__ and isinstance(values, list):
+        if not all(is_valid(value) for value in values):
+            raise TypeError(message)
+
+def get_catalog():
+    # Returns the resourceIDs, titles and lowercased titles of all Singstat time series, reusing the cached catalog until it is older than CATALOG_TTL seconds
+    cached = CATALOG_CACHE.get('catalog')
+    if cached and time.monotonic() - cached[0] < CATALOG_TTL:
+        return cached[1]
+    
+    json = decode_json(get_content(CATALOG_URL))
+    catalog = pd.DataFrame(json['records'], columns=['resourceId', 'title'])
+    # Lowercasing the titles once per fetch rather than on every get_resource_id call
+    catalog['titleLower'] = catalog['title'].fillna('').str.lower()
+    CATALOG_CACHE['catalog'] = (time.monotonic(), catalog)
+    return catalog
+
 def get_resource_id(keyphrases=None, match_all=False):
     """
     Retrieves resourceIDs of relevant Singstat time series datasets based on non case-sensitive keyphrases 
@@ -54,55 +217,57 @@ def get_resource_id(keyphrases=None, match_all=False):
     [15138]
     """
     # Checking parameters
-    if keyphrases != None:
-        if type(keyphrases) not in [str, list]:
+    if keyphrases is not None:
+        if not isinstance(keyphrases, (str, list)):
             raise TypeError('The argument keyphrases should be a string or a list of strings')
-        if type(keyphrases) == list:
-            if not all(isinstance(keyphrase, str) for keyphrase in keyphrases):
-                raise TypeError('The argument keyphrases should be a string or a list of strings')
+        check_list_elements(keyphrases, is_str, 'The argument keyphrases should be a string or a list of strings')
     if not isinstance(match_all, bool):
         raise TypeError('The argument match_all should be a boolean')
 
-    url = 'https://www.tablebuilder.singstat.gov.sg/publicfacing/rest/timeseries/resourceId?keyword=%&searchOption=all'
-    json = get_json(url)
-
-    if not json:
-        print('Failed to retrieve json file from Singstat')
-        return
+    catalog = get_catalog()
     
     def no_returns_check(ids):
         if len(ids) == 0:
             raise ValueError("No relevant datasets for given keyphrase")
     
     # Extracting resourceIDs by filtering for presence of keyphrases in time series datasets
-    if keyphrases == None:
-        ids = [list(dataset.values())[0] for dataset in json['records']]
-        no_returns_check(ids)
-        return ids
-    if type(keyphrases) == str:
-        ids = [list(dataset.values())[0] for dataset in json['records'] if keyphrases.lower() in list(dataset.values())[1].lower()]
-        no_returns_check(ids)
-        return ids
-    
-    elif type(keyphrases) == list:
-        if match_all == False:
-            regstr = '|'.join([keyphrase.lower() for keyphrase in keyphrases])
-            ids = [list(dataset.values())[0] for dataset in json['records'] if re.search(regstr, list(dataset.values())[1].lower())]
-            no_returns_check(ids)
-            return ids
-        
-        else:
-            ids = [list(dataset.values())[0] for dataset in json['records'] if all(keyphrase.lower() in list(dataset.values())[1].lower() for keyphrase in keyphrases)]
-            no_returns_check(ids)
-            return ids
+    if keyphrases is None:
+        keyphrases = []
+    elif isinstance(keyphrases, str):
+        keyphrases = [keyphrases]
+    keyphrases = [keyphrase.lower() for keyphrase in keyphrases]
+    
+    titles = catalog['titleLower']
+    
+    if not keyphrases:
+        mask = pd.Series(True, index=catalog.index)
+    elif match_all:
+        mask = pd.Series(True, index=catalog.index)
+        for keyphrase in keyphrases:
+            mask &= titles.str.contains(keyphrase, regex=False)
+    elif ahocorasick and all(keyphrases):
+        # Scanning each title once with an Aho-Corasick automaton regardless of the number of keyphrases
+        automaton = ahocorasick.Automaton()
+        for keyphrase in keyphrases:
+            automaton.add_word(keyphrase, keyphrase)
+        automaton.make_automaton()
+        mask = titles.map(lambda title: next(automaton.iter(title), None) is not None).astype(bool)
+    else:
+        # Escaping keyphrases so characters such as '.' or '|' are matched literally
+        mask = titles.str.contains('|'.join(re.escape(keyphrase) for keyphrase in keyphrases))
+    
+    ids = catalog.loc[mask, 'resourceId'].tolist()
+    no_returns_check(ids)
+    return ids
 
 def check_resource_ids(resource_ids):
-    if type(resource_ids) not in [int, list]:
+    if not (is_int(resource_ids) or isinstance(resource_ids, list)):
         raise TypeError('The argument resource_ids should be an integer or a list of integers')
-        
-    if type(resource_ids) == list:
-        if not all(isinstance(ID, int) for ID in resource_ids):
-            raise TypeError('The argument keyphrases should be an integer or a list of integers')
+    
+    check_list_elements(resource_ids, is_int, 'The argument resource_ids should be an integer or a list of integers')
+
+def metadata_url(ID):
+    return f'https://www.tablebuilder.singstat.gov.sg/publicfacing/rest/timeseries/metadata/{ID}'
 
 def get_overview(resource_ids):
     """
@@ -160,26 +325,68 @@ def get_overview(resource_ids):
     # Checking parameters
     check_resource_ids(resource_ids)
     
-    df_full = pd.DataFrame()
+    if isinstance(resource_ids, int):
+        resource_ids = [resource_ids]
 
-    def build_metadata_table(df_full, ID):
-        url = f'https://www.tablebuilder.singstat.gov.sg/publicfacing/rest/timeseries/metadata/{ID}'
-        json = get_json(url)
-        df = pd.DataFrame(json['records'])
-        df.drop(columns=['downloadFormats', 'termsOfUse', 'apiTermsOfService', 'url'], inplace=True)
-        df_full = pd.concat([df_full, df])
-        return df_full
-
-    if type(resource_ids) == int:
-        df_full = build_metadata_table(df_full, resource_ids)
+    urls = [metadata_url(ID) for ID in resource_ids]
+    
+    # Collecting the records of all IDs so that a single DataFrame is built
+    records = []
+    for json in fetch_json(urls):
+        records.extend(json['records'])
+    
+    df_full = pd.DataFrame(records)
+    df_full.drop(columns=['downloadFormats', 'termsOfUse', 'apiTermsOfService', 'url'], inplace=True, errors='ignore')
+    df_full.sort_values('resourceId', inplace=True, ignore_index=True)
+    return df_full
 
-    elif type(resource_ids) == list:
-        for ID in resource_ids:
-            df_full = build_metadata_table(df_full, ID)
+def tabledata_url(ID):
+    return f'https://www.tablebuilder.singstat.gov.sg/publicfacing/rest/timeseries/tabledata/{ID}'
 
-    df_full.sort_values('resourceId', inplace=True)
-    df_full.reset_index(inplace=True, drop=True)
-    return df_full
+def parse_period_index(index):
+    # Converts annual ('2019'), quarterly ('1975 1Q') and monthly ('2020 Jan') Singstat time labels into a PeriodIndex, leaving other formats such as half-yearly as strings
+    if len(index) == 0:
+        return index
+    
+    labels = index.astype(str)
+    if labels.str.fullmatch(r'\d{4}').all():
+        return pd.PeriodIndex(labels, freq='Y')
+    if labels.str.fullmatch(r'\d{4} [1-4]Q').all():
+        return pd.PeriodIndex(labels.str.slice(0, 4) + 'Q' + labels.str.slice(5, 6), freq='Q')
+    if labels.str.fullmatch(r'\d{4} [A-Za-z]{3}').all():
+        return pd.to_datetime(labels, format='%Y %b').to_period('M')
+    return index
+
+def build_table(json):
+    # Grouping the records into one {time: value} mapping per variable in a single pass instead of pivoting a long-form DataFrame
+    columns = defaultdict(dict)
+    for record in json['records']:
+        columns[(record['variableCode'], record['variableName'])][record['time']] = record['value']
+    
+    df = pd.DataFrame(columns).apply(pd.to_numeric, errors='coerce').astype('float64')
+    if columns:
+        df.columns.names = ['variableCode', 'variableName']
+    df.index = parse_period_index(df.index)
+    df.index.name = 'time'
+    if not df.index.is_monotonic_increasing:
+        df.sort_index(inplace=True)
+    return df
+
+def prepare_timeseries_request(resource_ids, limit, offset):
+    # Shared by get_timeseries and aget_timeseries: validates the arguments and returns the resourceIDs as a list with their urls and query params
+    check_resource_ids(resource_ids)
+    
+    if not is_int(limit):
+        raise TypeError('The argument limit should be an integer')
+    
+    if not is_int(offset):
+        raise TypeError('The argument offset should be an integer')
+    
+    if isinstance(resource_ids, int):
+        resource_ids = [resource_ids]
+    
+    urls = [tabledata_url(ID) for ID in resource_ids]
+    return resource_ids, urls, {'limit': limit, 'offset': offset}
 
 def get_timeseries(resource_ids, limit=10000, offset=0):
     """
@@ -210,145 +417,224 @@ def get_timeseries(resource_ids, limit=10000, offset=0):
             {15139: variableCode              M212261.1 M212261.1.2 M212261.1.1
          variableName Residential Properties  Non-landed      Landed
          time                                                       
-         1975 1Q                         8.9        10.5         7.4
-         1975 2Q                         9.1        11.2         7.7
-         1975 3Q                         9.1        11.5         7.8
-         1975 4Q                         9.1        11.5         7.9
-         1976 1Q                         9.5        11.5         7.9
+         1975Q1                          8.9        10.5         7.4
+         1975Q2                          9.1        11.2         7.7
+         1975Q3                          9.1        11.5         7.8
+         1975Q4                          9.1        11.5         7.9
+         1976Q1                          9.5        11.5         7.9
          ...                             ...         ...         ...
-         2019 3Q                       152.8       150.0       165.8
-         2019 4Q                       153.6       149.6       171.8
-         2020 1Q                       152.1       148.1       170.3
-         2020 2Q                       152.6       148.7       170.3
-         2020 3Q                       153.8       148.8       176.6
+         2019Q3                        152.8       150.0       165.8
+         2019Q4                        153.6       149.6       171.8
+         2020Q1                        152.1       148.1       170.3
+         2020Q2                        152.6       148.7       170.3
+         2020Q3                        153.8       148.8       176.6
 
          [183 rows x 3 columns],
          17122: variableCode                      M210641.2  \
          variableName Office Space In Central Region   
          time                                          
-         1975 1Q                                15.2   
-         1975 2Q                                15.2   
-         1975 3Q                                15.8   
-         1975 4Q                                16.3   
-         1976 1Q                                17.2   
+         1975Q1                                 15.2   
+         1975Q2                                 15.2   
+         1975Q3                                 15.8   
+         1975Q4                                 16.3   
+         1976Q1                                 17.2   
          ...                                     ...   
-         2019 3Q                               138.8   
-         2019 4Q                               138.1   
-         2020 1Q                               132.6   
-         2020 2Q                               126.9   
-         2020 3Q                               127.2   
+         2019Q3                                138.8   
+         2019Q4                                138.1   
+         2020Q1                                132.6   
+         2020Q2                                126.9   
+         2020Q3                                127.2   
 
          variableCode                                  M210641.2.2  \
          variableName Office Space In Central Region (Fringe Area)   
          time                                                        
-         1975 1Q                                               NaN   
-         1975 2Q                                               NaN   
-         1975 3Q                                               NaN   
-         1975 4Q                                               NaN   
-         1976 1Q                                               NaN   
+         1975Q1                                                NaN   
+         1975Q2                                                NaN   
+         1975Q3                                                NaN   
+         1975Q4                                                NaN   
+         1976Q1                                                NaN   
          ...                                                   ...   
-         2019 3Q                                             123.9   
-         2019 4Q                                             120.1   
-         2020 1Q                                             113.4   
-         2020 2Q                                             119.2   
-         2020 3Q                                             114.0   
+         2019Q3                                              123.9   
+         2019Q4                                              120.1   
+         2020Q1                                              113.4   
+         2020Q2                                              119.2   
+         2020Q3                                              114.0   
 
          variableCode                                   M210641.2.1  \
          variableName Office Space In Central Region (Central Area)   
          time                                                         
-         1975 1Q                                                NaN   
-         1975 2Q                                                NaN   
-         1975 3Q                                                NaN   
-         1975 4Q                                                NaN   
-         1976 1Q                                                NaN   
+         1975Q1                                                 NaN   
+         1975Q2                                                 NaN   
+         1975Q3                                                 NaN   
+         1975Q4                                                 NaN   
+         1976Q1                                                 NaN   
          ...                                                    ...   
-         2019 3Q                                              141.0   
-         2019 4Q                                              140.9   
-         2020 1Q                                              135.7   
-         2020 2Q                                              129.9   
-         2020 3Q                                              131.2   
+         2019Q3                                               141.0   
+         2019Q4                                               140.9   
+         2020Q1                                               135.7   
+         2020Q2                                               129.9   
+         2020Q3                                               131.2   
 
          variableCode                      M210641.5  \
          variableName Retail Space In Central Region   
          time                                          
-         1975 1Q                                 NaN   
-         1975 2Q                                 NaN   
-         1975 3Q                                 NaN   
-         1975 4Q                                 NaN   
-         1976 1Q                                 NaN   
+         1975Q1                                  NaN   
+         1975Q2                                  NaN   
+         1975Q3                                  NaN   
+         1975Q4                                  NaN   
+         1976Q1                                  NaN   
          ...                                     ...   
-         2019 3Q                               112.0   
-         2019 4Q                               114.0   
-         2020 1Q                               110.5   
-         2020 2Q                               108.8   
-         2020 3Q                               111.2   
+         2019Q3                                112.0   
+         2019Q4                                114.0   
+         2020Q1                                110.5   
+         2020Q2                                108.8   
+         2020Q3                                111.2   
 
          variableCode                                   M210641.5.1  \
          variableName Retail Space In Central Region (Central Area)   
          time                                                         
-         1975 1Q                                                NaN   
-         1975 2Q                                                NaN   
-         1975 3Q                                                NaN   
-         1975 4Q                                                NaN   
-         1976 1Q                                                NaN   
+         1975Q1                                                 NaN   
+         1975Q2                                                 NaN   
+         1975Q3                                                 NaN   
+         1975Q4                                                 NaN   
+         1976Q1                                                 NaN   
          ...                                                    ...   
-         2019 3Q                                               96.0   
-         2019 4Q                                               99.5   
-         2020 1Q                                               94.4   
-         2020 2Q                                               93.8   
-         2020 3Q                                               92.2   
+         2019Q3                                                96.0   
+         2019Q4                                                99.5   
+         2020Q1                                                94.4   
+         2020Q2                                                93.8   
+         2020Q3                                                92.2   
 
          variableCode                                  M210641.5.2  
          variableName Retail Space In Central Region (Fringe Area)  
          time                                                       
-         1975 1Q                                               NaN  
-         1975 2Q                                               NaN  
-         1975 3Q                                               NaN  
-         1975 4Q                                               NaN  
-         1976 1Q                                               NaN  
+         1975Q1                                                NaN  
+         1975Q2                                                NaN  
+         1975Q3                                                NaN  
+         1975Q4                                                NaN  
+         1976Q1                                                NaN  
          ...                                                   ...  
-         2019 3Q                                             132.4  
-         2019 4Q                                             126.3  
-         2020 1Q                                             122.4  
-         2020 2Q                                             117.1  
-         2020 3Q                                             123.5  
+         2019Q3                                              132.4  
+         2019Q4                                              126.3  
+         2020Q1                                              122.4  
+         2020Q2                                              117.1  
+         2020Q3                                              123.5  
 
          [183 rows x 6 columns]}
     """
     # Checking parameters
-    check_resource_ids(resource_ids)
+    resource_ids, urls, params = prepare_timeseries_request(resource_ids, limit, offset)
+    jsons = fetch_json(urls, params=params)
+    return {ID: build_table(json) for ID, json in zip(resource_ids, jsons)}
+
+async def aget_timeseries(resource_ids, limit=10000, offset=0):
+    """
+    Retrieves corresponding Singstat timeseries datasets from within a running event loop, e.g. a Jupyter notebook
     
-    if type(limit) != int:
-        raise TypeError('The argument limit should be an integer')
+    Parameters
+    ----------
+    resource_ids: int or list 
+      A python integer or list of integers to match with available Singstat time series resourceIDs
     
-    if type(offset) != int:
-        raise TypeError('The argument offset should be an integer')
+    limit: int
+      A python integer specifying the maximum number of records to be included for each corresponding dataset
     
-    def build_table(ID):
-        url = f'https://www.tablebuilder.singstat.gov.sg/publicfacing/rest/timeseries/tabledata/{ID}'
-        json = get_json(url, params={'limit': limit, 'offset': offset})
-        df = pd.DataFrame(json['records'])
-        df = df.pivot(index='time', columns=['variableCode', 'variableName'], values='value')
-        return df
+    offset: int
+      A python integer specifying the first n number of records to be excluded for each corresponding dataset
+
+    Returns
+    -------
+    dict 
+      Returns a dictionary of key value pairings of resourceIDs and their corresponding time series dataset in a pandas DataFrame 
+
+    Example
+    -------
+    >>> from singstat import aget_timeseries
+    >>> timeseries = await aget_timeseries([15139, 17122])
+    """
+    # Checking parameters
+    resource_ids, urls, params = prepare_timeseries_request(resource_ids, limit, offset)
+    jsons = await afetch_json(urls, params=params)
+    return {ID: build_table(json) for ID, json in zip(resource_ids, jsons)}
+
+class lazy_timeseries(Mapping):
+    """
+    Read-only mapping of resourceIDs to their Singstat time series datasets, which are only retrieved when first accessed;
+    dict(...) retrieves all remaining datasets at once
+
+    Parameters
+    ----------
+    resource_ids: list 
+      A python list of integers of the Singstat time series resourceIDs included in the mapping
+    
+    cache: dict
+      A python dictionary of already retrieved time series datasets, shared with mappings created by subset
+    """
+    def __init__(self, resource_ids, cache=None):
+        self.resource_ids = list(resource_ids)
+        self._ids = set(self.resource_ids)
+        self._cache = cache if cache is not None else dict()
+    
+    def __getitem__(self, ID):
+        if ID not in self._ids:
+            raise KeyError(ID)
+        if ID not in self._cache:
+            self._cache.update(get_timeseries(ID))
+        return self._cache[ID]
+    
+    def __iter__(self):
+        return iter(self.resource_ids)
+    
+    def __len__(self):
+        return len(self.resource_ids)
+    
+    def __contains__(self, ID):
+        # Membership only needs the resourceIDs, so nothing is retrieved
+        return ID in self._ids
+    
+    # Bulk access, including dict(...) which goes through keys(), retrieves all missing datasets concurrently first
+    def keys(self):
+        self.load(self.resource_ids)
+        return super().keys()
     
-    timeseries_dict = dict()
+    def values(self):
+        self.load(self.resource_ids)
+        return super().values()
     
-    if type(resource_ids) == int:
-        timeseries_dict[resource_ids] = build_table(resource_ids)
+    def items(self):
+        self.load(self.resource_ids)
+        return super().items()
     
-    elif type(resource_ids) == list:
-        for ID in resource_ids:
-            timeseries_dict[ID] = build_table(ID)
+    def __repr__(self):
+        # Listing the resourceIDs without retrieving anything, since repr is also called by debuggers, logging and tracebacks
+        loaded = [ID for ID in self.resource_ids if ID in self._cache]
+        pending = [ID for ID in self.resource_ids if ID not in self._cache]
+        return f'lazy_timeseries(loaded={loaded}, pending={pending})'
     
-    return timeseries_dict
+    def load(self, resource_ids):
+        # Retrieving the datasets not yet accessed concurrently rather than one at a time through __getitem__
+        missing = [ID for ID in resource_ids if ID in self._ids and ID not in self._cache]
+        if missing:
+            self._cache.update(get_timeseries(missing))
+    
+    def subset(self, resource_ids):
+        return lazy_timeseries(resource_ids, cache=self._cache)
 
 class timeseries_search():
     def __init__(self, keyphrases=None, match_all=False):
         self.resource_ids = get_resource_id(keyphrases, match_all=match_all)
         self.overview = get_overview(self.resource_ids)
-        self.timeseries = get_timeseries(self.resource_ids)
+        
+        # Time series datasets are retrieved on first access, typically after filter_datasets has narrowed down the resourceIDs
+        self.timeseries = lazy_timeseries(self.resource_ids)
+        
+        # Caching the columns used by filter_datasets so they are not recomputed on every call
+        self._frequency = self.overview['frequency'].str.lower()
+        # startPeriod always leads with the year ('2019', '1975 1Q', '2020 Jan', '2020-07'), so the first four characters are parsed directly;
+        # anything non-numeric becomes NaN and is dropped by any start_year filter
+        self._start_year = pd.to_numeric(self.overview['startPeriod'].str.slice(0, 4), errors='coerce')
     
-    def filter_datasets(self, frequency, start_year=None, inplace=False):
+    def filter_datasets(self, frequency, start_year=None, inplace=False, verbose=False):
         """
         Filters timeseries_search object based on frequency and start year of time series dataset
 
@@ -359,6 +645,12 @@ class timeseries_search():
         
         start_year:
           A python integer 
+        
+        inplace:
+          A python boolean which determines whether to update the timeseries_search object instead of returning the filtered datasets
+        
+        verbose:
+          A python boolean which determines whether to display the overview of the filtered datasets
 
         Returns
         -------
@@ -371,44 +663,49 @@ class timeseries_search():
           Updates the timeseries_search object
         """
         # Checking parameters
-        if type(frequency) not in [str, list] or not all(isinstance(freq, str) for freq in frequency):
+        if not isinstance(frequency, (str, list)):
             raise TypeError('The argument frequency should be a string or a list of strings')
         
-        if type(start_year) not in [int, type(None)] or len(str(start_year)) != 4:
+        check_list_elements(frequency, is_str, 'The argument frequency should be a string or a list of strings')
+        
+        if start_year is not None and (not is_int(start_year) or len(str(start_year)) != 4):
             raise TypeError('The argument start_year should be a 4 digit integer')
         
         if not isinstance(inplace, bool):
             raise TypeError('The argument inplace should be a boolean')
         
-        frequencies = ['all,', 'annual', 'quarterly', 'monthly', 'ad-hoc', 'half-yearly']
-        if type(frequency) == list:
+        if not isinstance(verbose, bool):
+            raise TypeError('The argument verbose should be a boolean')
+        
+        frequencies = ['all', 'annual', 'quarterly', 'monthly', 'ad-hoc', 'half-yearly']
+        mask = pd.Series(True, index=self.overview.index)
+        if isinstance(frequency, list):
             for freq in frequency:
                 assert freq in frequencies, "Frequencies must be chosen from: 'all', 'annual', 'quarterly', 'monthly', 'ad-hoc', 'half-yearly'"
             if 'all' not in frequency: 
-                filtered_overview = self.overview[self.overview['frequency'].str.lower().isin(frequency)]
-            else:
-                filtered_overview = self.overview
+                mask &= self._frequency.isin(set(frequency))
         
-        elif type(frequency) == str:
+        elif isinstance(frequency, str):
             assert frequency in frequencies, "Frequencies must be chosen from: 'all', 'annual', 'quarterly', 'monthly', 'ad-hoc', 'half-yearly'"
             if frequency != 'all':
-                filtered_overview = self.overview[self.overview['frequency'].str.lower() == frequency]
-            else:
-                filtered_overview = self.overview
+                mask &= self._frequency == frequency
                 
         if start_year:
-            filtered_overview = filtered_overview[[int(i[0]) >= start_year for i in filtered_overview['startPeriod'].str.split()]]
-        else:
-            filtered_overview = filtered_overview
+            mask &= self._start_year >= start_year
         
+        filtered_overview = self.overview.loc[mask]
         new_ids = list(filtered_overview['resourceId'])
         
+        if verbose:
+            display(filtered_overview)
+        
         if inplace == True:
             self.resource_ids = new_ids
-            self.overview = self.overview.loc[self.overview['resourceId'].isin(new_ids)]
-            self.timeseries = {ID: self.timeseries[ID] for ID in self.resource_ids}
-            display(self.overview.loc[self.overview['resourceId'].isin(new_ids)])
+            self.overview = filtered_overview
+            self._frequency = self._frequency.loc[mask]
+            self._start_year = self._start_year.loc[mask]
+            self.timeseries = self.timeseries.subset(self.resource_ids)
         
         else:
-            display(self.overview.loc[self.overview['resourceId'].isin(new_ids)])
-            return {ID: self.timeseries[ID] for ID in new_ids}
\ No newline at end of file
+            self.timeseries.load(new_ids)
+            return {ID: self.timeseries[ID] for ID in new_ids}
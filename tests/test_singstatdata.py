@@ -1,7 +1,13 @@
 from singstatdata import __version__
 from singstatdata import singstatdata
 
+import asyncio
+import io
+import json
+import time
+import pytest
 import requests
+import urllib3
 import pandas as pd
 import re
 from requests.exceptions import HTTPError
@@ -28,6 +34,214 @@ def test_get_resource_id_match_all():
     len_food_price = len(singstatdata.get_resource_id(['food', 'price'], match_all=True))
     assert len(singstatdata.get_resource_id(['food', 'price'], match_all=False)) == len_food + len_price - len_food_price
 
+def test_get_json_cached(monkeypatch):
+    calls = []
+    def get_content(url, params=None):
+        calls.append(url)
+        return b'{"records": [{"resourceId": 1}]}'
+    monkeypatch.setattr(singstatdata, 'get_content', get_content)
+    singstatdata.CONTENT_CACHE.clear()
+    
+    first = singstatdata.get_json('https://example.com/cached')
+    first['records'].append('mutated')
+    assert singstatdata.get_json('https://example.com/cached') == {'records': [{'resourceId': 1}]}
+    assert len(calls) == 1
+    singstatdata.CONTENT_CACHE.clear()
+
+def test_get_json_raises_http_error_after_retries(monkeypatch):
+    attempts = []
+    def make_request(self, conn, method, url, *args, **kwargs):
+        attempts.append(url)
+        return urllib3.HTTPResponse(body=io.BytesIO(b''), status=503, preload_content=False)
+    # Stubbing below the session's HTTPAdapter so that its urllib3 Retry policy still runs, without sleeping between attempts
+    monkeypatch.setattr(urllib3.connectionpool.HTTPConnectionPool, '_make_request', make_request)
+    monkeypatch.setattr(urllib3.util.retry.Retry, 'sleep', lambda self, response=None: None)
+    singstatdata.CONTENT_CACHE.clear()
+    
+    with pytest.raises(HTTPError) as error:
+        singstatdata.get_json('https://example.com/unavailable')
+    assert not isinstance(error.value, requests.exceptions.RetryError)
+    assert error.value.response.status_code == 503
+    assert len(attempts) == singstatdata.RETRIES + 1
+    assert len(singstatdata.CONTENT_CACHE) == 0
+
+def test_fetch_json_stops_after_failure(monkeypatch):
+    calls = []
+    def get_json(url, params=None):
+        calls.append(url)
+        if url == 'fail':
+            raise HTTPError('500 Server Error')
+        time.sleep(0.2)
+        return {'records': []}
+    monkeypatch.setattr(singstatdata, 'get_json', get_json)
+    
+    urls = ['fail'] + [f'ok{i}' for i in range(4 * singstatdata.MAX_WORKERS)]
+    with pytest.raises(HTTPError):
+        singstatdata.fetch_json(urls)
+    # Only the requests already picked up by a worker when the failure surfaced are sent
+    assert len(calls) <= singstatdata.MAX_WORKERS + 1
+
+def test_afetch_json_does_not_block_loop_after_failure(monkeypatch):
+    def get_json(url, params=None):
+        if url == 'fail':
+            raise HTTPError('500 Server Error')
+        time.sleep(1.5)
+        return {'records': []}
+    monkeypatch.setattr(singstatdata, 'get_json', get_json)
+    monkeypatch.setattr(singstatdata, 'httpx', None)
+    
+    async def main():
+        ticks = []
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+        task = asyncio.ensure_future(ticker())
+        start = time.monotonic()
+        with pytest.raises(HTTPError):
+            await singstatdata.afetch_json(['ok0', 'fail', 'ok1', 'ok2'])
+        elapsed = time.monotonic() - start
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return elapsed, [tick for tick in ticks if tick > start]
+    
+    elapsed, ticks = asyncio.run(main())
+    assert elapsed < 1
+    assert len(ticks) >= 2
+
+def test_aget_json_shares_cache(monkeypatch):
+    httpx = pytest.importorskip('httpx')
+    requests_sent = []
+    def handler(request):
+        requests_sent.append(str(request.url))
+        return httpx.Response(200, content=b'{"records": [{"resourceId": 2}]}')
+    monkeypatch.setattr(singstatdata, 'get_content', lambda url, params=None: pytest.fail('get_json should read the cache'))
+    singstatdata.CONTENT_CACHE.clear()
+    
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await singstatdata.aget_json(client, 'https://example.com/shared', {'limit': 1})
+    assert asyncio.run(main()) == {'records': [{'resourceId': 2}]}
+    assert singstatdata.get_json('https://example.com/shared', {'limit': 1}) == {'records': [{'resourceId': 2}]}
+    assert asyncio.run(main()) == {'records': [{'resourceId': 2}]}
+    assert len(requests_sent) == 1
+    singstatdata.CONTENT_CACHE.clear()
+
+def run_aget_json(handler, monkeypatch):
+    httpx = pytest.importorskip('httpx')
+    delays = []
+    async def sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(singstatdata.asyncio, 'sleep', sleep)
+    singstatdata.CONTENT_CACHE.clear()
+    
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await singstatdata.aget_json(client, 'https://example.com/retry')
+    try:
+        return asyncio.run(main()), delays
+    finally:
+        singstatdata.CONTENT_CACHE.clear()
+
+def test_aget_json_retries_with_backoff(monkeypatch):
+    httpx = pytest.importorskip('httpx')
+    responses = [httpx.Response(503), httpx.Response(429, headers={'Retry-After': '3'}), httpx.Response(200, content=b'{"records": []}')]
+    result, delays = run_aget_json(lambda request: responses.pop(0), monkeypatch)
+    assert result == {'records': []}
+    assert delays == [singstatdata.BACKOFF_FACTOR, 3.0]
+
+def test_aget_json_raises_http_error_after_retries(monkeypatch):
+    httpx = pytest.importorskip('httpx')
+    attempts = []
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(503)
+    with pytest.raises(HTTPError):
+        run_aget_json(handler, monkeypatch)
+    assert len(attempts) == singstatdata.RETRIES + 1
+    assert len(singstatdata.CONTENT_CACHE) == 0
+
+@pytest.fixture
+def catalog(monkeypatch):
+    records = [
+        {'resourceId': 1, 'title': 'Office Property Price Index'},
+        {'resourceId': 2, 'title': 'Residential PROPERTY Price Index'},
+        {'resourceId': 3, 'title': 'Food Prices (1.5kg Pack)'},
+        {'resourceId': 4, 'title': None},
+    ]
+    monkeypatch.setattr(singstatdata, 'get_content', lambda url, params=None: json.dumps({'records': records}).encode())
+    monkeypatch.setattr(singstatdata, 'CATALOG_CACHE', dict())
+
+def test_get_resource_id_offline(catalog):
+    assert singstatdata.get_catalog()['titleLower'].tolist() == ['office property price index', 'residential property price index', 'food prices (1.5kg pack)', '']
+    assert singstatdata.get_resource_id('property') == [1, 2]
+    assert singstatdata.get_resource_id(['office', 'food'], match_all=False) == [1, 3]
+    assert singstatdata.get_resource_id(['property', 'office'], match_all=True) == [1]
+    assert singstatdata.get_resource_id('1.5kg') == [3]
+    with pytest.raises(ValueError):
+        singstatdata.get_resource_id('1x5kg')
+
+def test_get_catalog_cached(monkeypatch):
+    clock = [1000.0]
+    fetches = []
+    def get_content(url, params=None):
+        fetches.append(url)
+        if len(fetches) == 1:
+            raise HTTPError('503 Server Error')
+        return json.dumps({'records': [{'resourceId': len(fetches), 'title': 'Price'}]}).encode()
+    monkeypatch.setattr(singstatdata, 'get_content', get_content)
+    monkeypatch.setattr(singstatdata.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(singstatdata, 'CATALOG_CACHE', dict())
+    
+    # A failed fetch is not cached, so the next call retries
+    with pytest.raises(HTTPError):
+        singstatdata.get_catalog()
+    catalog = singstatdata.get_catalog()
+    assert len(fetches) == 2
+    
+    clock[0] += singstatdata.CATALOG_TTL - 1
+    assert singstatdata.get_catalog() is catalog
+    assert len(fetches) == 2
+    
+    clock[0] += 1
+    assert singstatdata.get_catalog()['resourceId'].tolist() == [3]
+    assert len(fetches) == 3
+
+def test_bool_is_not_an_integer_argument():
+    with pytest.raises(TypeError):
+        singstatdata.check_resource_ids(True)
+    with pytest.raises(TypeError):
+        singstatdata.check_resource_ids([17030, False])
+    with pytest.raises(TypeError):
+        singstatdata.get_timeseries(17030, limit=True)
+    with pytest.raises(TypeError):
+        singstatdata.get_timeseries(17030, offset=False)
+
+@pytest.fixture
+def search(monkeypatch):
+    overview = pd.DataFrame({
+        'resourceId': [101, 102, 103, 104],
+        'title': ['Annual Price', 'Quarterly Price', 'Monthly Price', 'Half-yearly Price'],
+        'frequency': ['Annual', 'Quarterly', 'Monthly', 'Half-Yearly'],
+        'startPeriod': ['1990', '1975 1Q', '2005 Jan', '2010 1H'],
+    })
+    monkeypatch.setattr(singstatdata, 'get_resource_id', lambda keyphrases, match_all=False: [103, 101, 104, 102])
+    monkeypatch.setattr(singstatdata, 'get_overview', lambda resource_ids: overview)
+    calls = []
+    def get_timeseries(resource_ids):
+        calls.append(resource_ids)
+        return {ID: pd.DataFrame() for ID in ([resource_ids] if isinstance(resource_ids, int) else resource_ids)}
+    monkeypatch.setattr(singstatdata, 'get_timeseries', get_timeseries)
+    search = singstatdata.timeseries_search('price')
+    search.timeseries_calls = calls
+    return search
+
+def test_filter_datasets_start_year_type(search):
+    with pytest.raises(TypeError):
+        search.filter_datasets('all', start_year=True)
+    with pytest.raises(TypeError):
+        search.filter_datasets('all', start_year=199)
+
 def test_get_overview():
     assert type(singstatdata.get_overview(17030)) == pd.DataFrame
     assert type(singstatdata.get_overview([17030, 17035, 17036, 17037])) == pd.DataFrame
@@ -36,10 +250,99 @@ def test_get_overview_length():
     ids = [17030, 17035, 17036, 17037]
     assert len(singstatdata.get_overview(ids)) == len(ids)
     
+def records(*rows):
+    return {'records': [{'variableCode': code, 'variableName': name, 'time': time, 'value': value} for code, name, time, value in rows]}
+
+def test_build_table_annual():
+    df = singstatdata.build_table(records(('M1', 'Total', '2019', '1.5'), ('M1', 'Total', '2018', '2')))
+    assert df.index.equals(pd.PeriodIndex(['2018', '2019'], freq='Y', name='time'))
+    assert df.columns.names == ['variableCode', 'variableName']
+    assert df[('M1', 'Total')].tolist() == [2.0, 1.5]
+    assert (df.dtypes == 'float64').all()
+
+def test_build_table_quarterly_out_of_order_and_ragged():
+    df = singstatdata.build_table(records(
+        ('M1', 'Total', '1976 1Q', '9.5'),
+        ('M1', 'Total', '1975 4Q', '9.1'),
+        ('M1.1', 'Landed', '1976 1Q', '7.9'),
+    ))
+    assert df.index.equals(pd.PeriodIndex(['1975Q4', '1976Q1'], freq='Q', name='time'))
+    assert list(df.columns) == [('M1', 'Total'), ('M1.1', 'Landed')]
+    assert df[('M1', 'Total')].tolist() == [9.1, 9.5]
+    assert pd.isna(df.loc[pd.Period('1975Q4'), ('M1.1', 'Landed')])
+
+def test_build_table_monthly_sorted_chronologically():
+    df = singstatdata.build_table(records(('M1', 'Total', '2020 Feb', '2'), ('M1', 'Total', '2020 Jan', '1'), ('M1', 'Total', '2019 Dec', 'na')))
+    assert df.index.equals(pd.PeriodIndex(['2019-12', '2020-01', '2020-02'], freq='M', name='time'))
+    assert df[('M1', 'Total')].tolist()[1:] == [1.0, 2.0]
+    assert pd.isna(df[('M1', 'Total')].iloc[0])
+
+def test_build_table_half_yearly_keeps_labels():
+    df = singstatdata.build_table(records(('M1', 'Total', '2020 2H', '2'), ('M1', 'Total', '2020 1H', '1')))
+    assert list(df.index) == ['2020 1H', '2020 2H']
+    assert df.index.name == 'time'
+    assert df[('M1', 'Total')].tolist() == [1.0, 2.0]
+
+def test_build_table_empty():
+    df = singstatdata.build_table({'records': []})
+    assert df.empty
+    assert df.index.name == 'time'
+
 def test_get_timeseries():
     assert type(singstatdata.get_timeseries(17030)) == dict
     assert type(singstatdata.get_timeseries([17030, 17035, 17036, 17037])) == dict
     
 def test_get_timeseries_length():
     ids = [17030, 17035, 17036, 17037]
-    assert len(singstatdata.get_timeseries(ids)) == len(ids)
\ No newline at end of file
+    assert len(singstatdata.get_timeseries(ids)) == len(ids)
+    
+def test_aget_timeseries():
+    ids = [17030, 17035, 17036, 17037]
+    timeseries = asyncio.run(singstatdata.aget_timeseries(ids))
+    assert type(timeseries) == dict
+    assert list(timeseries) == ids
+
+def test_filter_datasets_all(search):
+    assert set(search.filter_datasets('all')) == set(search.resource_ids)
+    assert set(search.filter_datasets(['all', 'annual'])) == set(search.resource_ids)
+
+def test_filter_datasets_frequency(search):
+    assert list(search.filter_datasets('quarterly')) == [102]
+    assert set(search.filter_datasets(['annual', 'monthly'])) == {101, 103}
+    assert set(search.filter_datasets('half-yearly')) == {104}
+    with pytest.raises(AssertionError):
+        search.filter_datasets('weekly')
+
+def test_filter_datasets_start_year(search):
+    assert set(search.filter_datasets('all', start_year=2000)) == {103, 104}
+    assert set(search.filter_datasets(['annual', 'half-yearly'], start_year=1990)) == {101, 104}
+    assert set(search.filter_datasets('quarterly', start_year=1976)) == set()
+
+def test_filter_datasets_inplace(search):
+    assert search.filter_datasets(['annual', 'monthly'], inplace=True) is None
+    assert set(search.resource_ids) == {101, 103}
+    assert set(search.overview['resourceId']) == {101, 103}
+    assert set(search.timeseries) == {101, 103}
+    assert set(search.filter_datasets('all', start_year=2000)) == {103}
+
+def test_timeseries_search_lazy(search):
+    assert search.timeseries_calls == []
+    assert len(search.timeseries) == len(search.resource_ids)
+    assert 101 in search.timeseries
+    assert search.timeseries_calls == []
+    
+    assert type(search.timeseries[101]) == pd.DataFrame
+    assert search.timeseries_calls == [101]
+    assert set(search.timeseries._cache) == {101}
+
+def test_timeseries_search_repr_is_lazy(search):
+    search.timeseries[101]
+    assert repr(search.timeseries) == 'lazy_timeseries(loaded=[101], pending=[103, 104, 102])'
+    assert search.timeseries_calls == [101]
+
+def test_timeseries_search_bulk_access(search):
+    search.timeseries[101]
+    timeseries = dict(search.timeseries)
+    assert list(timeseries) == search.resource_ids
+    # The remaining datasets are retrieved together rather than one at a time
+    assert search.timeseries_calls == [101, [103, 104, 102]]